@@ -1,34 +1,100 @@
 import asyncio
 import logging
+import time
 import aiohttp
 import re
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .const import DOMAIN, CONF_URL
+from .const import (
+    DOMAIN,
+    CONF_URL,
+    CONF_ISOLATED_IO,
+    CONF_COMPRESSION,
+    CONF_VERIFY_SSL,
+    SERVICE_PROFILE,
+    CONF_SECONDS,
+    SERVICE_GET_SNAPSHOT,
+    CONF_SINCE,
+    CONF_EPOCH,
+)
 from .hub import SmartPlaceCHHub 
+from . import websocket_api
 
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["light", "event", "climate", "cover", "sensor"]
 
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional(CONF_SECONDS, default=60.0): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=3600)
+    ),
+})
+
+SNAPSHOT_SCHEMA = vol.Schema({
+    vol.Optional(CONF_SINCE): vol.Coerce(int),
+    vol.Optional(CONF_EPOCH): vol.Coerce(int),
+})
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Smart Place CH from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hub = SmartPlaceCHHub(hass)
+    hub = SmartPlaceCHHub(
+        hass,
+        isolated_io=entry.options.get(CONF_ISOLATED_IO, False),
+        compression=entry.options.get(CONF_COMPRESSION, False),
+        verify_ssl=entry.options.get(CONF_VERIFY_SSL, True),
+    )
 
     if not await hub.async_setup(entry.data[CONF_URL]):
         return False
     
     hass.data[DOMAIN][entry.entry_id] = hub
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Profile the hub and write the report to the config directory."""
+        path = hass.config.path(f"{DOMAIN}_profile.{int(time.time())}.txt")
+        await hub.async_profile(call.data[CONF_SECONDS], path)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
+
+    @callback
+    def async_handle_get_snapshot(call: ServiceCall) -> ServiceResponse:
+        """Return the state of all devices, or the changes since a version."""
+        return hub.states.snapshot(call.data.get(CONF_SINCE), call.data.get(CONF_EPOCH))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SNAPSHOT,
+        async_handle_get_snapshot,
+        schema=SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    websocket_api.async_setup(hass)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when the options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     hub = hass.data[DOMAIN].pop(entry.entry_id)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_GET_SNAPSHOT)
     await hub.stop()
 
     unload_ok = all(
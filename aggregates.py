@@ -0,0 +1,68 @@
+# custom_components/smart_place_ch/aggregates.py
+
+AGGREGATE_LIGHTS_ON = "lights_on"
+AGGREGATE_COVERS_OPEN = "covers_open"
+
+
+class PageAggregates:
+    """Per-page counts of lights that are on and covers that are open.
+
+    The page is the room/page tag of the discovery messages (e.g.
+    Uebersicht1). Counts are adjusted from the previous state of the one
+    device a frame is about, so an update never looks at other devices.
+    """
+
+    def __init__(self):
+        self._light_page: dict[str, str] = {}
+        self._cover_page: dict[str, str] = {}
+        # Last known state per device, None until the first frame
+        self._light_on: dict[str, bool | None] = {}
+        self._cover_open: dict[str, bool | None] = {}
+        # page -> {"lights": n, "lights_on": n, "covers": n, "covers_open": n}
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def _page(self, page: str) -> dict[str, int]:
+        return self.counts.setdefault(
+            page, {"lights": 0, AGGREGATE_LIGHTS_ON: 0, "covers": 0, AGGREGATE_COVERS_OPEN: 0}
+        )
+
+    def add_light(self, light_id: str, page: str):
+        if light_id in self._light_page:
+            return
+        self._light_page[light_id] = page
+        self._light_on[light_id] = None
+        self._page(page)["lights"] += 1
+
+    def add_cover(self, cover_id: str, page: str):
+        if cover_id in self._cover_page:
+            return
+        self._cover_page[cover_id] = page
+        self._cover_open[cover_id] = None
+        self._page(page)["covers"] += 1
+
+    def update_light(self, light_id: str, value: int) -> str | None:
+        """Apply a light frame. Returns the page if its sensors need an update."""
+        page = self._light_page.get(light_id)
+        if page is None:
+            return None
+        return self._update(page, self._light_on, light_id, value > 0, AGGREGATE_LIGHTS_ON)
+
+    def update_cover(self, cover_id: str, position: int) -> str | None:
+        """Apply a blind frame. Returns the page if its sensors need an update."""
+        page = self._cover_page.get(cover_id)
+        if page is None:
+            return None
+        # Same as the cover entity: a raw position of 0 is closed
+        return self._update(page, self._cover_open, cover_id, position != 0, AGGREGATE_COVERS_OPEN)
+
+    def _update(self, page: str, states: dict, device_id: str, is_on: bool, key: str) -> str | None:
+        previous = states[device_id]
+        if previous == is_on:
+            return None
+        states[device_id] = is_on
+        if is_on:
+            self.counts[page][key] += 1
+        elif previous:
+            self.counts[page][key] -= 1
+        # Also report the first frame of a device, even if it is off
+        return page
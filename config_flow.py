@@ -1,10 +1,11 @@
 from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 
 # Use CONF_URL from homeassistant.const if it exists, otherwise define it
 # For this custom purpose, we define it in our const.py
-from .const import DOMAIN, CONF_URL
+from .const import DOMAIN, CONF_URL, CONF_ISOLATED_IO, CONF_COMPRESSION, CONF_VERIFY_SSL
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_URL): str
@@ -26,4 +27,43 @@ class SmartPlaceCHConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return SmartPlaceCHOptionsFlow(config_entry)
+
+
+class SmartPlaceCHOptionsFlow(config_entries.OptionsFlow):
+    """Handle the options for Smart Place CH."""
+
+    def __init__(self, config_entry):
+        """Initialize the options flow."""
+        # Home Assistant only sets self.config_entry itself since 2024.11,
+        # and no longer allows setting it, so keep our own reference
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                # Run socket I/O and parsing in a dedicated thread
+                vol.Optional(
+                    CONF_ISOLATED_IO, default=options.get(CONF_ISOLATED_IO, False)
+                ): bool,
+                # Negotiate permessage-deflate, falls back if the server refuses
+                vol.Optional(
+                    CONF_COMPRESSION, default=options.get(CONF_COMPRESSION, False)
+                ): bool,
+                vol.Optional(
+                    CONF_VERIFY_SSL, default=options.get(CONF_VERIFY_SSL, True)
+                ): bool,
+            }),
+        )
@@ -1,4 +1,20 @@
 DOMAIN = "smart_place_ch"
 CONF_URL = "token"
 # This is the message for triggering the doorbell
-DOORBELL_RING_MESSAGE = "SOUND1:DingDong1"
\ No newline at end of file
+DOORBELL_RING_MESSAGE = "SOUND1:DingDong1"
+# Dispatcher signal for doorbell rings
+SIGNAL_DOORBELL = f"{DOMAIN}_ring"
+# Rings within this many seconds of the previous one are dropped
+DOORBELL_DEBOUNCE_SECONDS = 2.0
+
+# Options
+CONF_ISOLATED_IO = "isolated_io"
+CONF_COMPRESSION = "compression"
+CONF_VERIFY_SSL = "verify_ssl"
+
+# Services
+SERVICE_PROFILE = "profile"
+CONF_SECONDS = "seconds"
+SERVICE_GET_SNAPSHOT = "get_snapshot"
+CONF_SINCE = "since"
+CONF_EPOCH = "epoch"
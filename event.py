@@ -1,7 +1,6 @@
 # custom_components/my_integration/event.py
 
 import logging
-from typing import Callable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
@@ -14,7 +13,7 @@ from homeassistant.components.event import (
 )
 
 # Assuming your integration's domain is 'my_integration'
-from .const import DOMAIN, DOORBELL_RING_MESSAGE
+from .const import DOMAIN, SIGNAL_DOORBELL
 # You would get your hub instance from hass.data
 # from .hub import MyHub  # Uncomment and adapt this to your actual hub class
 
@@ -63,34 +62,23 @@ class Doorbell(EventEntity):
             identifiers={(DOMAIN, self._config_entry_id)},
             name="SmartPlace Doorbell"
         )
-        
-        # This will hold the function to remove the callback later
-        self._remove_callback: Callable[[], None] | None = None
 
     @callback
-    def _handle_event(self, message: str) -> None:
+    def _handle_event(self, message: str, received: float) -> None:
         """Handle an incoming event from the hub."""
-        if message.startswith(DOORBELL_RING_MESSAGE):
-            _LOGGER.info("Doorbell ring event received from hub")
-            # This is the core function that fires the event in Home Assistant
-            self._trigger_event("ring")
-            # Optionally, you can write the event to the entity's state attributes
-            self.async_write_ha_state()
-        else:
-            _LOGGER.warning(f"Wrong message dispatched to doorbell: {message}")
+        # The hub only dispatches ring messages on this signal
+        # This is the core function that fires the event in Home Assistant
+        self._trigger_event("ring")
+        # Optionally, you can write the event to the entity's state attributes
+        self.async_write_ha_state()
+        self._hub.record_doorbell_latency(received)
+        _LOGGER.info("Doorbell ring event received from hub")
 
     async def async_added_to_hass(self) -> None:
         """Register for updates from the hub."""
-        update_signal = f"ring"
+        # async_on_remove disconnects the signal when the entity is removed
         self.async_on_remove(
             async_dispatcher_connect(
-                self.hass, update_signal, self._handle_event
+                self.hass, SIGNAL_DOORBELL, self._handle_event
             )
         )
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Run when entity will be removed from hass."""
-        # Unregister the callback when the entity is removed
-        if self._remove_callback:
-            self._remove_callback()
-            _LOGGER.debug("Removed doorbell callback from the hub")
\ No newline at end of file
@@ -1,45 +1,156 @@
 # custom_components/smart_place_ch/hub.py
 
 import asyncio
+import contextlib
 import logging
 import aiohttp
 import re
+import threading
+import time
+from collections import deque
+from typing import Callable
+from urllib.parse import urlsplit
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .const import DOMAIN, DOORBELL_RING_MESSAGE
+from .const import (
+    DOMAIN,
+    DOORBELL_RING_MESSAGE,
+    DOORBELL_DEBOUNCE_SECONDS,
+    SIGNAL_DOORBELL,
+)
+from .aggregates import PageAggregates
+from .profiler import HubProfiler
+from .state_table import (
+    KLIMA_FIELDS,
+    SECTION_CLIMATE,
+    SECTION_COVERS,
+    SECTION_LIGHTS,
+    StateTable,
+)
+from .stats import ConnectionStats, HandshakeStats, TrafficTotals
+from .tls import SessionCachingContext, session_caching_context
+from .update_queue import UpdateQueue
 
 _LOGGER = logging.getLogger(__name__)
+
+KLIMA_PATTERN = re.compile(r"^(TEMPIST|TEMPSOLL|KLIMASINFO)(\d+):(.+)$")
+JALOUSIE_PATTERN = re.compile(r"^JALICO(\d+):(\d+)-(\d{2})$")
+PAGE_PATTERN = re.compile(r"^[A-Za-z_]+\d+$")
+# Maximum number of distinct pending updates in isolated I/O mode
+UPDATE_QUEUE_SIZE = 1024
+# Window bits requested for permessage-deflate
+WS_COMPRESS_WBITS = 15
+
+
+def parse_message(message: str) -> tuple | None:
+    """Parse a state message into a (type, device id, data) tuple."""
+    if message.startswith("leuchte"):
+        try:
+            key, value_str = message.replace("leuchte", "").split(":")
+            return ("leuchte", key, int(value_str))
+        except (ValueError, IndexError):
+            return None
+
+    if (klima_match := KLIMA_PATTERN.match(message)):
+        key, device_id, value = klima_match.groups()
+        return ("klima", device_id, {"key": key, "value": value})
+
+    if (jalousie_match := JALOUSIE_PATTERN.match(message)):
+        device_id, position, tilt = jalousie_match.groups()
+        return ("jalousie", device_id, {"position": position, "tilt": tilt})
+
+    return None
+
+
+def _layout(properties: list[str]) -> dict:
+    """Return the page/room tag and the position of a discovered device."""
+    layout = {"page": None, "x": None, "y": None}
+    if len(properties) > 2 and properties[1].endswith("px") and properties[2].endswith("px"):
+        try:
+            layout["x"] = int(properties[1][:-2])
+            layout["y"] = int(properties[2][:-2])
+        except ValueError:
+            pass
+    # The page tag is the last property that looks like "Uebersicht1"
+    for prop in reversed(properties[1:]):
+        if PAGE_PATTERN.match(prop):
+            layout["page"] = prop
+            break
+    return layout
+
+
 class SmartPlaceCHHub:
     """Manages the WebSocket connection and data for Smart Place CH."""
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        isolated_io: bool = False,
+        compression: bool = False,
+        verify_ssl: bool = True,
+    ):
         self.hass = hass
+        self._verify_ssl = verify_ssl
+        # Built once in async_setup and shared by every session of the hub
+        self._ssl_context: SessionCachingContext | None = None
+        self._handshakes = HandshakeStats()
+        self._isolated_io = isolated_io
+        self._compression = compression
+        # Servers (host:port) that failed the handshake when asked for compression
+        self._compression_rejected: set[str] = set()
         self._main_uri = None
         self._main_ws = None
         self._listener_task = None
         self.lights = {}
         self.klimas = {}
         self.jalousien = {} # ADDED: Dictionary for blind devices
+        # Lights on and covers open per page, kept up to date by the dispatchers
+        self.pages = PageAggregates()
+        # Consolidated, versioned state of all devices for the snapshot API
+        self.states = StateTable()
         self._initial_token = None
+        # Only set while the profile service is running
+        self._profiler: HubProfiler | None = None
+        # Only used in isolated I/O mode
+        self._io_thread: threading.Thread | None = None
+        self._io_loop: asyncio.AbstractEventLoop | None = None
+        self._io_task: asyncio.Task | None = None
+        self._updates: UpdateQueue | None = None
+        # Traffic counters of the open connection and of all closed ones
+        self._connection: ConnectionStats | None = None
+        self._traffic = TrafficTotals()
+        # Doorbell debouncing and latency metrics
+        self._last_ring = float("-inf")
+        self._doorbell_rings = 0
+        self._doorbell_debounced = 0
+        self._doorbell_latency_total = 0.0
+        self._doorbell_latency_max = 0.0
+        self._doorbell_recent: deque = deque(maxlen=20)
 
     async def async_setup(self, initial_token: str) -> bool:
         """Perform connection and device discovery."""
         _LOGGER.info("Starting Smart Place CH Hub setup")
         self._initial_token = initial_token
-        self._main_uri = await self._get_main_websocket_uri(self._initial_token)
-        if not self._main_uri:
-            return False
+        # Loading the CA bundle blocks, do it once and off the event loop
+        self._ssl_context = await self.hass.async_add_executor_job(
+            session_caching_context, self._verify_ssl
+        )
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(self._main_uri, timeout=10, ssl=False) as ws:
+            async with self._create_session() as session:
+                self._main_uri = await self._get_main_websocket_uri(session, self._initial_token)
+                if not self._main_uri:
+                    return False
+                async with self._ws_connect(session, self._main_uri, timeout=10) as ws:
                     self._main_ws = ws
                     _LOGGER.info("WebSocket connected. Discovering devices.")
 
-                    await ws.send_str("GiveMeMainmenu")
+                    await self._send_str(ws, "GiveMeMainmenu")
                     while True:
                         msg = await asyncio.wait_for(ws.receive(), timeout=30.0)
                         if msg.type != aiohttp.WSMsgType.TEXT: continue
+                        self._connection.received(msg.data)
                         if msg.data == "GiveMeMainMenuFinished": break
                         self._parse_discovery_message(msg.data)
                     _LOGGER.info(
@@ -53,8 +164,16 @@ class SmartPlaceCHHub:
         except Exception as e:
             _LOGGER.error(f"Error during discovery handshake: {e}", exc_info=True)
             return False
+        finally:
+            self._main_ws = None
 
-        self._listener_task = self.hass.async_create_background_task(self._listen(), name="state_listener")
+        # State frames are parsed on receipt and dispatched in batches, so a
+        # doorbell ring never waits behind a burst, in either mode
+        self._updates = UpdateQueue(UPDATE_QUEUE_SIZE)
+        if self._isolated_io:
+            self._start_io_thread()
+        else:
+            self._listener_task = self.hass.async_create_background_task(self._listen(), name="state_listener")
         _LOGGER.info("Smart Place CH Hub setup complete. Listener started.")
         return True
     
@@ -69,7 +188,10 @@ class SmartPlaceCHHub:
                 light_type = "schalter"
                 if "dimmer" in properties: light_type = "dimmer"
                 if light_id not in self.lights:
-                    self.lights[light_id] = {"name": name, "type": light_type}
+                    self.lights[light_id] = {"name": name, "type": light_type, **_layout(properties)}
+                    if page := self.lights[light_id]["page"]:
+                        self.pages.add_light(light_id, page)
+                    self.states.add_device(SECTION_LIGHTS, light_id, name)
 
             elif message.startswith("INHALTKlimas"):
                 parts = message.replace("INHALTKlimas", "").split(":", 1)
@@ -77,7 +199,8 @@ class SmartPlaceCHHub:
                 properties = parts[1].split(",")
                 name = properties[0]
                 if klima_id not in self.klimas:
-                    self.klimas[klima_id] = {"name": name}
+                    self.klimas[klima_id] = {"name": name, **_layout(properties)}
+                    self.states.add_device(SECTION_CLIMATE, klima_id, name)
             
             # INHALTJalousien1:M_SI_01 Markise,310px,863px,markise,,60,Uebersicht1
             elif message.startswith("INHALTJalousien"):
@@ -87,24 +210,75 @@ class SmartPlaceCHHub:
                 name = properties[0]
                 type = properties[3]
                 if jalousie_id not in self.jalousien:
-                    self.jalousien[jalousie_id] = {"name": name, "type": type}
+                    self.jalousien[jalousie_id] = {"name": name, "type": type, **_layout(properties)}
+                    if page := self.jalousien[jalousie_id]["page"]:
+                        self.pages.add_cover(jalousie_id, page)
+                    self.states.add_device(SECTION_COVERS, jalousie_id, name)
 
         except Exception:
             _LOGGER.warning(f"Could not parse discovery message: '{message}'")
     
     async def stop(self):
-        if self._listener_task: self._listener_task.cancel()
+        if self._updates is not None:
+            self._updates.close()
+        if self._io_thread is not None:
+            # Cancel the listener on its own loop and wait for the thread
+            try:
+                self._io_loop.call_soon_threadsafe(self._io_task.cancel)
+            except RuntimeError:
+                pass  # The loop already stopped and closed
+            await self.hass.async_add_executor_job(self._io_thread.join, 10)
+            if self._io_thread.is_alive():
+                _LOGGER.warning("I/O thread did not stop within 10 seconds")
+            return
+        if self._listener_task:
+            self._listener_task.cancel()
+            # Wait for the listener to close its socket and session
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
+            self._listener_task = None
         if self._main_ws and not self._main_ws.closed: await self._main_ws.close()
 
+    def _start_io_thread(self):
+        """Run the listener in a dedicated thread with its own event loop."""
+        self._io_loop = asyncio.new_event_loop()
+        # The loop is not running yet, so the task can be created from here
+        self._io_task = self._io_loop.create_task(self._listen())
+        self._io_thread = threading.Thread(
+            target=self._run_io_loop, name=f"{DOMAIN}_io", daemon=True
+        )
+        self._io_thread.start()
+
+    def _run_io_loop(self):
+        """Thread target: run the listener until it is cancelled."""
+        asyncio.set_event_loop(self._io_loop)
+        try:
+            self._io_loop.run_until_complete(self._io_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._io_loop.run_until_complete(self._io_loop.shutdown_asyncgens())
+            self._io_loop.close()
+            _LOGGER.debug("I/O thread stopped")
+
     @callback
     def _dispatch_light_update(self, light_id: str, value):
         """Dispatch an update for a light entity."""
+        self.states.update(SECTION_LIGHTS, light_id, {"brightness": value})
         signal = f"update_{DOMAIN}_leuchte{light_id}"
         async_dispatcher_send(self.hass, signal, value)
+        if (page := self.pages.update_light(light_id, value)) is not None:
+            self._dispatch_page_update(page)
 
     @callback
     def _dispatch_klima_update(self, klima_id: str, data: dict):
         """Dispatch an update for a climate entity."""
+        if field := KLIMA_FIELDS.get(data["key"]):
+            value = data["value"]
+            if field != "mode":
+                with contextlib.suppress(ValueError):
+                    value = float(value)
+            self.states.update(SECTION_CLIMATE, klima_id, {field: value})
         signal = f"update_{DOMAIN}_klima{klima_id}"
         async_dispatcher_send(self.hass, signal, data)
 
@@ -112,34 +286,162 @@ class SmartPlaceCHHub:
     @callback
     def _dispatch_jalousie_update(self, jalousie_id: str, data: dict):
         """Dispatch an update for a jalousie entity."""
+        # Same conversion as the cover entity
+        self.states.update(SECTION_COVERS, jalousie_id, {
+            "position": 100 - int(data["position"]),
+            "tilt": 100 if data["tilt"] == "01" else 0,
+        })
         signal = f"update_{DOMAIN}_jalousie{jalousie_id}"
         async_dispatcher_send(self.hass, signal, data)
+        if (page := self.pages.update_cover(jalousie_id, int(data["position"]))) is not None:
+            self._dispatch_page_update(page)
+
+    @callback
+    def _dispatch_page_update(self, page: str):
+        """Dispatch an update for the aggregate sensors of a page."""
+        signal = f"update_{DOMAIN}_page{page}"
+        async_dispatcher_send(self.hass, signal)
 
-    def _dispatch_doorbell_event(self, message):
-        """Dispatch a doorbell ring event."""
-        signal = f"ring"
-        async_dispatcher_send(self.hass, signal, message)
+    @callback
+    def _dispatch_doorbell_event(self, message: str, received: float):
+        """Dispatch a doorbell ring event, dropping repeated rings."""
+        if received - self._last_ring < DOORBELL_DEBOUNCE_SECONDS:
+            self._doorbell_debounced += 1
+            _LOGGER.debug(f"Debounced doorbell ring: {message}")
+            return
+        self._last_ring = received
+        async_dispatcher_send(self.hass, SIGNAL_DOORBELL, message, received)
+
+    @callback
+    def record_doorbell_latency(self, received: float):
+        """Record the time from receiving a ring frame to firing the event."""
+        latency = time.monotonic() - received
+        self._doorbell_rings += 1
+        self._doorbell_latency_total += latency
+        self._doorbell_latency_max = max(self._doorbell_latency_max, latency)
+        # Wall clock time at which the frame was received
+        self._doorbell_recent.append(
+            (round(time.time() - latency, 3), round(latency * 1000, 3))
+        )
+
+    @callback
+    def _dispatch(self, update: tuple) -> str:
+        """Dispatch a parsed update to the entities. Returns the message type."""
+        kind, device_id, data = update
+        try:
+            if kind == "leuchte":
+                self._dispatch_light_update(device_id, data)
+            elif kind == "klima":
+                self._dispatch_klima_update(device_id, data)
+            elif kind == "jalousie":
+                self._dispatch_jalousie_update(device_id, data)
+            elif kind == "doorbell":
+                self._dispatch_doorbell_event(data["message"], data["received"])
+        except (ValueError, IndexError):
+            _LOGGER.error(f"Update {update} cannot be handled.")
+        return kind
+
+    def _handle_priority_message(self, message: str, received: float):
+        """Hand a time-critical message to the HA loop ahead of state updates."""
+        update = ("doorbell", "", {"message": message, "received": received})
+        if self._io_thread is not None:
+            if self._updates.put_priority(update):
+                self.hass.loop.call_soon_threadsafe(self._drain_updates)
+        # On the HA loop already, dispatch before the queued state updates
+        elif self._profiler is None:
+            self._dispatch(update)
+        else:
+            self._profiler.time_message(self._dispatch, update)
+
+    def _enqueue_message(self, message: str) -> str | None:
+        """Parse a state message and queue it for dispatch on the HA loop."""
+        update = parse_message(message)
+        if update is None:
+            return None
+        kind, device_id, data = update
+        # Only the latest value per device (and climate key) is of interest
+        key = (kind, device_id, data["key"]) if kind == "klima" else (kind, device_id)
+        if self._updates.put(key, update):
+            if self._io_thread is not None:
+                self.hass.loop.call_soon_threadsafe(self._drain_updates)
+            else:
+                # Runs after the frames ws.receive() has buffered, rings included
+                self.hass.loop.call_soon(self._drain_updates)
+        return kind
+
+    async def _run_on_io_loop(self, func: Callable[[], None]):
+        """Run func on the I/O thread and wait for it."""
+        async def run():
+            func()
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._io_loop)
+        await asyncio.wrap_future(future)
+
+    @callback
+    def _drain_updates(self):
+        """Dispatch everything the I/O thread queued since the last drain."""
+        for update in self._updates.drain():
+            if self._profiler is None:
+                self._dispatch(update)
+            else:
+                self._profiler.time_message(self._dispatch, update)
+
+    async def async_profile(self, seconds: float, path: str) -> str:
+        """Profile the hub for the given number of seconds and write a report."""
+        if self._profiler is not None:
+            raise HomeAssistantError("A Smart Place CH profile is already running")
+        profiler = HubProfiler()
+        try:
+            profiler.start()
+        except ValueError as e:
+            # cProfile refuses to run alongside another active profiler
+            raise HomeAssistantError(f"Cannot start profiler: {e}") from e
+        io_profiled = False
+        if self._io_thread is not None:
+            # Receiving and parsing happen on the I/O thread, profile it too
+            try:
+                await self._run_on_io_loop(profiler.start_io)
+                io_profiled = True
+            except RuntimeError:
+                profiler.io_unavailable()
+        self._profiler = profiler
+        _LOGGER.info(f"Profiling Smart Place CH hub for {seconds}s")
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._profiler = None
+            profiler.stop()
+            if io_profiled:
+                with contextlib.suppress(RuntimeError):
+                    await self._run_on_io_loop(profiler.stop_io)
+        await self.hass.async_add_executor_job(profiler.write_report, path)
+        _LOGGER.info(f"Smart Place CH profile written to {path}")
+        return path
 
     async def _listen(self):
         """Listen for state changes on the WebSocket with reconnection logic."""
         retry_delay = 1
-        klima_pattern = re.compile(r"^(TEMPIST|TEMPSOLL|KLIMASINFO)(\d+):(.+)$")
-        jalousie_pattern = re.compile(r"^JALICO(\d+):(\d+)-(\d{2})$") # ADDED: Regex for blinds
-
-        while True:
-            self._main_uri = await self._get_main_websocket_uri(self._initial_token)
-            if not self._main_uri:
-                _LOGGER.error(f"Not able to get the URI for {self._initial_token}")
-                self._main_ws = None
-                await asyncio.sleep(retry_delay)
-                retry_delay = min(retry_delay * 2, 120)
-                continue
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.ws_connect(self._main_uri, timeout=10, ssl=False, heartbeat=30) as ws:
+
+        # One session for the lifetime of the listener, on the loop it runs on
+        async with self._create_session() as session:
+            while True:
+                self._main_uri = await self._get_main_websocket_uri(session, self._initial_token)
+                if not self._main_uri:
+                    _LOGGER.error(f"Not able to get the URI for {self._initial_token}")
+                    self._main_ws = None
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 2, 120)
+                    continue
+                try:
+                    async with self._ws_connect(
+                        session, self._main_uri, timeout=10, heartbeat=30
+                    ) as ws:
                         self._main_ws = ws
-                        _LOGGER.info("Persistent listener connection established.")
-                        await ws.send_str("SocketConnected:1")
+                        _LOGGER.info(
+                            f"Persistent listener connection established "
+                            f"(compression: {ws.compress or 'off'})."
+                        )
+                        await self._send_str(ws, "SocketConnected:1")
                         retry_delay = 1
                         while not ws.closed:
                             try:
@@ -147,35 +449,16 @@ class SmartPlaceCHHub:
                                 msg = await ws.receive(timeout=60)
                                 if msg.type == aiohttp.WSMsgType.TEXT:
                                     message = msg.data
+                                    # Classify time-critical frames before anything else
+                                    if message.startswith(DOORBELL_RING_MESSAGE):
+                                        self._handle_priority_message(message, time.monotonic())
+                                    elif self._profiler is None:
+                                        self._enqueue_message(message)
+                                    else:
+                                        self._profiler.time_io_message(self._enqueue_message, message)
+
+                                    self._connection.received(message)
                                     _LOGGER.debug(f"Received message: {message}")
-                                    
-                                    if message.startswith("leuchte"):
-                                        try:
-                                            key, value_str = message.replace("leuchte", "").split(":")
-                                            self._dispatch_light_update(key, int(value_str))
-                                        except (ValueError, IndexError): pass
-                                    
-                                    elif (klima_match := klima_pattern.match(message)):
-                                        try:
-                                            key, device_id, value = klima_match.groups()
-                                            update_data = {"key": key, "value": value}
-                                            self._dispatch_klima_update(device_id, update_data)
-                                        except (ValueError, IndexError): pass
-
-                                    # ADDED: Blind state parsing
-                                    elif (jalousie_match := jalousie_pattern.match(message)):
-                                        try:
-                                            device_id, position, tilt = jalousie_match.groups()
-                                            update_data = {"position": position, "tilt": tilt}
-                                            self._dispatch_jalousie_update(device_id, update_data)
-                                        except (ValueError, IndexError):
-                                            _LOGGER.error(f"Mesage {message} cannot be parsed.")
-                                            pass
-
-                                    elif message.startswith(DOORBELL_RING_MESSAGE):
-                                        try:
-                                            self._dispatch_doorbell_event(message)
-                                        except (ValueError, IndexError): pass
 
                                 elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                                     _LOGGER.info("Server closed connection")
@@ -187,38 +470,156 @@ class SmartPlaceCHHub:
                             except asyncio.TimeoutError:
                                 # No message received, send a keep-alive ping.
                                 _LOGGER.debug("No message received in 60 seconds, sending a keep-alive ping.")
-                                await ws.send_str("SocketConnected:1")
+                                await self._send_str(ws, "SocketConnected:1")
             
-            except Exception as e:
-                _LOGGER.error(f"Listener connection error: {e}")
+                except Exception as e:
+                    _LOGGER.error(f"Listener connection error: {e}")
             
-            finally:
-                if self._main_ws and not self._main_ws.closed:
-                    await self._main_ws.close()
-                self._main_ws = None
+                finally:
+                    if self._main_ws and not self._main_ws.closed:
+                        await self._main_ws.close()
+                    self._main_ws = None
+
+                # Not in the finally block, so a cancelled listener exits right away
                 _LOGGER.error(f"Disconnected from listener, will retry in {retry_delay}s")
                 await asyncio.sleep(retry_delay)
                 retry_delay = min(retry_delay * 2, 120)
 
-    async def _get_main_websocket_uri(self, initial_token: str) -> str | None:
+    @contextlib.asynccontextmanager
+    async def _ws_connect(self, session: aiohttp.ClientSession, url: str, **kwargs):
+        """Connect a WebSocket, negotiating permessage-deflate if enabled."""
+        # A server without permessage-deflate just leaves the extension out of
+        # its answer and aiohttp connects uncompressed (ws.compress == 0). This
+        # handles servers that fail the handshake when asked for it.
+        ws = None
+        compression_failed = False
+        server = urlsplit(url).netloc
+        if self._compression and server not in self._compression_rejected:
+            try:
+                ws = await session.ws_connect(url, compress=WS_COMPRESS_WBITS, **kwargs)
+            except aiohttp.WSServerHandshakeError as e:
+                _LOGGER.debug(f"Handshake with compression failed ({e}), retrying without it")
+                compression_failed = True
+        if ws is None:
+            ws = await session.ws_connect(url, **kwargs)
+            if compression_failed:
+                # Only now it is clear that compression, not an outage or a bad
+                # token, made the handshake fail. Don't ask again.
+                _LOGGER.warning(f"{server} rejects compression, connecting without it from now on")
+                self._compression_rejected.add(server)
+        self._connection = ConnectionStats(ws)
+        try:
+            yield ws
+        finally:
+            # Before closing, so the final socket counters and the TLS session
+            # can still be read
+            self._finish_connection()
+            if (ssl_object := ws.get_extra_info("ssl_object")) is not None:
+                self._ssl_context.save_session(ssl_object)
+            await ws.close()
+
+    async def _send_str(self, ws: aiohttp.ClientWebSocketResponse, data: str):
+        """Send a text frame and count it."""
+        await ws.send_str(data)
+        if self._connection is not None:
+            self._connection.sent(data)
+
+    def _finish_connection(self):
+        """Add the counters of the current connection to the totals."""
+        if self._connection is not None:
+            self._connection.close()
+            self._traffic.add(self._connection)
+            self._connection = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session using the hub's SSL context, on the running loop."""
+        connector = aiohttp.TCPConnector(ssl=self._ssl_context)
+        return aiohttp.ClientSession(
+            connector=connector, trace_configs=[self._handshakes.trace_config()]
+        )
+
+    async def _get_main_websocket_uri(self, session: aiohttp.ClientSession, initial_token: str) -> str | None:
         """Perform bootstrap connection to find the main WebSocket URI."""
         headers = {"User-Agent": "Mozilla/5.0"}
         bootstrap_url = f"wss://spr2.smartplace.ch:8770/StartAppExt/?TOKEN={initial_token}"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(bootstrap_url, headers=headers, timeout=10, ssl=False) as ws:
-                    msg = await ws.receive(timeout=10)
-                    if msg.type != aiohttp.WSMsgType.TEXT: return None
-                    match = re.search(r"GoToLinkSSL:([^/]+)", msg.data)
-                    if not match: return None
-                    return f"wss://{match.group(1)}/UpdatenLS"
+            # Made before every listener reconnect, so it is counted like the others
+            async with self._ws_connect(session, bootstrap_url, headers=headers, timeout=10) as ws:
+                msg = await ws.receive(timeout=10)
+                if msg.type != aiohttp.WSMsgType.TEXT: return None
+                self._connection.received(msg.data)
+                match = re.search(r"GoToLinkSSL:([^/]+)", msg.data)
+                if not match: return None
+                return f"wss://{match.group(1)}/UpdatenLS"
         except Exception as e:
             _LOGGER.error(f"Error during bootstrap connection: {e}")
             return None
             
     async def async_send_command(self, command_data: str):
         """Send a command over the WebSocket."""
+        if self._io_thread is not None:
+            # The socket belongs to the I/O thread's loop, send it from there
+            future = asyncio.run_coroutine_threadsafe(
+                self._send_command(command_data), self._io_loop
+            )
+            await asyncio.wrap_future(future)
+        else:
+            await self._send_command(command_data)
+
+    async def _send_command(self, command_data: str):
+        """Send a command on the loop that owns the WebSocket."""
         if self._main_ws and not self._main_ws.closed:
-            await self._main_ws.send_str(command_data)
+            await self._send_str(self._main_ws, command_data)
         else:
-            _LOGGER.error("Cannot send command, WebSocket is not connected.")
\ No newline at end of file
+            _LOGGER.error("Cannot send command, WebSocket is not connected.")
+
+    def _resources(self) -> dict:
+        """Return counts of what the hub holds, to spot leaks on long runs."""
+        # Tasks of the hub on the HA loop, the listener itself in main loop mode
+        hub_tasks = [
+            task for task in asyncio.all_tasks(self.hass.loop)
+            if getattr(task.get_coro(), "__qualname__", "").startswith(type(self).__name__)
+        ]
+        main_ws = self._main_ws
+        return {
+            "hub_tasks": len(hub_tasks),
+            "listener_running": (
+                self._io_thread.is_alive() if self._io_thread is not None
+                else self._listener_task is not None and not self._listener_task.done()
+            ),
+            "open_websockets": int(main_ws is not None and not main_ws.closed),
+            "connections_closed": self._traffic.connections,
+            "threads": threading.active_count(),
+        }
+
+    def diagnostics(self) -> dict:
+        """Return runtime information for the diagnostics download."""
+        # The I/O thread may replace these while this runs, read them once
+        connection = self._connection
+        main_ws = self._main_ws
+        return {
+            "isolated_io": self._isolated_io,
+            "connected": main_ws is not None and not main_ws.closed,
+            "lights": len(self.lights),
+            "klimas": len(self.klimas),
+            "jalousien": len(self.jalousien),
+            "update_queue": self._updates.stats() if self._updates else None,
+            "resources": self._resources(),
+            "state_version": self.states.version,
+            "verify_ssl": self._verify_ssl,
+            "handshakes": self._handshakes.as_dict(),
+            "compression": self._compression,
+            "compression_rejected": sorted(self._compression_rejected),
+            "connection": connection.as_dict() if connection else None,
+            "traffic_totals": self._traffic.as_dict(),
+            "doorbell": {
+                "rings": self._doorbell_rings,
+                "debounced": self._doorbell_debounced,
+                "latency_avg_ms": round(
+                    self._doorbell_latency_total / self._doorbell_rings * 1000, 3
+                ) if self._doorbell_rings else None,
+                "latency_max_ms": round(self._doorbell_latency_max * 1000, 3),
+                # (frame received timestamp, latency in ms) of the last rings
+                "recent": list(self._doorbell_recent),
+            },
+        }
@@ -0,0 +1,119 @@
+# custom_components/smart_place_ch/profiler.py
+
+import cProfile
+import io
+import pstats
+import time
+from typing import Any, Callable
+
+
+class HubProfiler:
+    """Collects cProfile stats and per-message timings for one profile run."""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        # Only set in isolated I/O mode, profiles the I/O thread
+        self._io_profile: cProfile.Profile | None = None
+        self._io_note = None
+        self._started = None
+        self._stopped = None
+        # message kind -> [count, total seconds, max seconds]
+        self.message_times: dict[str, list] = {}
+        # Receiving and parsing, kept apart from dispatching. On the I/O thread
+        # in isolated I/O mode, where it runs concurrently.
+        self.io_message_times: dict[str, list] = {}
+
+    def start(self):
+        """Start profiling the calling thread (the HA event loop)."""
+        self._profile.enable()
+        self._started = time.monotonic()
+
+    def stop(self):
+        """Stop profiling."""
+        self._profile.disable()
+        self._stopped = time.monotonic()
+
+    def start_io(self):
+        """Start profiling the I/O thread. Must be called on that thread."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Since Python 3.12 the profiler of the HA thread sees all threads
+            self._io_note = "I/O thread: included in the HA thread stats"
+            return
+        self._io_profile = profile
+        self._io_note = "I/O thread: profiled separately, merged into the stats below"
+
+    def stop_io(self):
+        """Stop profiling the I/O thread. Must be called on that thread."""
+        if self._io_profile is not None:
+            self._io_profile.disable()
+
+    def io_unavailable(self):
+        """Note that the I/O thread could not be profiled."""
+        self._io_note = "I/O thread: not profiled, it was not running"
+
+    def time_message(self, handler: Callable[[Any], str | None], message: Any) -> str | None:
+        """Run the dispatch handler and account its time to the message kind."""
+        return self._time(self.message_times, handler, message)
+
+    def time_io_message(self, handler: Callable[[Any], str | None], message: Any) -> str | None:
+        """Same as time_message, for receiving and parsing."""
+        return self._time(self.io_message_times, handler, message)
+
+    @staticmethod
+    def _time(times: dict, handler: Callable[[Any], str | None], message: Any) -> str | None:
+        start = time.perf_counter()
+        kind = handler(message)
+        elapsed = time.perf_counter() - start
+        entry = times.setdefault(kind or "unknown", [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        return kind
+
+    @staticmethod
+    def _table(title: str, times: dict) -> list[str]:
+        lines = [title, f"{'type':<12}{'count':>10}{'total ms':>12}{'avg us':>10}{'max us':>10}"]
+        for kind, (count, total, longest) in sorted(
+            times.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                f"{kind:<12}{count:>10}{total * 1000:>12.2f}"
+                f"{total / count * 1e6:>10.1f}{longest * 1e6:>10.1f}"
+            )
+        if not times:
+            lines.append("(no messages received)")
+        return lines
+
+    def write_report(self, path: str):
+        """Write the message breakdown and sorted stats to path. Blocking."""
+        duration = (self._stopped or time.monotonic()) - (self._started or 0)
+        lines = [f"Smart Place CH profile, {duration:.1f}s", ""]
+        lines.extend(self._table("Per message type (HA event loop, dispatch):", self.message_times))
+        lines.append("")
+        if self._io_note is not None:
+            lines.extend(self._table(
+                "Per message type (I/O thread, receive and parse):", self.io_message_times
+            ))
+            lines.extend(["", self._io_note])
+        else:
+            lines.extend(self._table(
+                "Per message type (HA event loop, receive and parse):", self.io_message_times
+            ))
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        if self._io_profile is not None:
+            stats.add(self._io_profile)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        # Only the integration's own code, the full dump is in the .prof file
+        stats.print_stats("smart_place_ch")
+
+        with open(path, "w", encoding="utf-8") as report:
+            report.write("\n".join(lines))
+            report.write("\n\n")
+            report.write(stream.getvalue())
+        stats.dump_stats(f"{path}.prof")
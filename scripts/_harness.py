@@ -0,0 +1,192 @@
+"""Shared pieces of the development scripts: a fake Smart Place server and hub setup.
+
+The scripts need Home Assistant installed (pip install homeassistant) but no
+running instance and no network access, everything talks to 127.0.0.1.
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import logging
+import random
+import sys
+import threading
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "smart_place_ch"
+
+DOORBELL = "SOUND1:DingDong1"
+
+
+def load_integration():
+    """Import the integration from the repository root as the smart_place_ch package."""
+    if PACKAGE in sys.modules:
+        return sys.modules[PACKAGE]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def discovery_menu(lights: int = 60, klimas: int = 12, jalousien: int = 24, pages: int = 6) -> list[str]:
+    """Return a discovery menu shaped like the one the server sends."""
+    menu = []
+    for i in range(1, lights + 1):
+        kind = "dimmer" if i % 3 == 0 else "schalter"
+        menu.append(
+            f"INHALTLeuchten{i}:L_{i:02d} Leuchte Raum {i % pages},"
+            f"{100 + i * 7}px,{200 + i * 3}px,{kind},,40,Uebersicht{i % pages + 1}"
+        )
+    for i in range(1, klimas + 1):
+        menu.append(
+            f"INHALTKlimas{i}:K_{i:02d} Klima Raum {i % pages},"
+            f"{300 + i * 5}px,{400 + i * 2}px,klima,,40,Uebersicht{i % pages + 1}"
+        )
+    for i in range(1, jalousien + 1):
+        kind = "jalousie" if i % 2 else "markise"
+        menu.append(
+            f"INHALTJalousien{i}:M_{i:02d} Jalousie Raum {i % pages},"
+            f"{500 + i * 4}px,{600 + i * 6}px,{kind},,60,Uebersicht{i % pages + 1}"
+        )
+    menu.append("GiveMeMainMenuFinished")
+    return menu
+
+
+def state_frames(count: int, lights: int = 60, klimas: int = 12, jalousien: int = 24, seed: int = 0) -> list[str]:
+    """Return a burst of random state frames for the devices of discovery_menu."""
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(count):
+        pick = rng.random()
+        if pick < 0.6:
+            frames.append(f"leuchte{rng.randint(1, lights)}:{rng.choice((0, 0, 128, 255))}")
+        elif pick < 0.85:
+            key = rng.choice(("TEMPIST", "TEMPSOLL", "KLIMASINFO"))
+            value = rng.choice(("heizen", "kühlen", "null")) if key == "KLIMASINFO" else str(rng.randint(18, 26))
+            frames.append(f"{key}{rng.randint(1, klimas)}:{value}")
+        else:
+            frames.append(f"JALICO{rng.randint(1, jalousien)}:{rng.choice((0, 40, 100))}-{rng.choice(('00', '01'))}")
+    return frames
+
+
+class FakeServer:
+    """WebSocket server speaking enough of the Smart Place protocol for the hub.
+
+    It answers GiveMeMainmenu with the discovery menu and SocketConnected:1
+    with the connect burst. Everything else is recorded as a command.
+    """
+
+    def __init__(self, menu: list[str], connect_burst: list[str] | None = None, compress: bool = True):
+        self.menu = menu
+        self.connect_burst = connect_burst or []
+        self.compress = compress
+        self.commands: list[str] = []
+        self.sockets: set[web.WebSocketResponse] = set()
+        self.connections = 0
+        self.port = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/UpdatenLS"
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse(compress=self.compress)
+        await ws.prepare(request)
+        self.connections += 1
+        self.sockets.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "GiveMeMainmenu":
+                    await self._send(ws, self.menu)
+                elif msg.data == "SocketConnected:1":
+                    await self._send(ws, self.connect_burst)
+                else:
+                    self.commands.append(msg.data)
+        finally:
+            self.sockets.discard(ws)
+        return ws
+
+    @staticmethod
+    async def _send(ws: web.WebSocketResponse, frames: list[str]):
+        # The client may be dropped halfway, on purpose
+        with contextlib.suppress(ConnectionResetError):
+            for frame in frames:
+                if ws.closed:
+                    break
+                await ws.send_str(frame)
+
+    async def start(self):
+        """Start serving on the running loop."""
+        self.loop = asyncio.get_running_loop()
+        app = web.Application()
+        app.router.add_get("/UpdatenLS", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.close_all()
+        await self._runner.cleanup()
+
+    def start_in_thread(self):
+        """Serve from a thread with its own loop, so stalls of the caller don't affect it."""
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake_server", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop_thread(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(10)
+
+    async def send_all(self, frames: list[str]):
+        """Send frames to every connected client."""
+        for ws in list(self.sockets):
+            await self._send(ws, frames)
+
+    async def close_all(self):
+        """Drop every client connection, as a server restart would."""
+        for ws in list(self.sockets):
+            await ws.close()
+
+
+def quiet_hub_logs(package: str = PACKAGE):
+    """Hide the hub's errors about disconnects the scripts force on purpose."""
+    logging.getLogger(package).setLevel(logging.CRITICAL)
+
+
+def create_hub(hass, server: FakeServer, **options):
+    """Create a hub that bootstraps to the fake server instead of smartplace.ch."""
+    from smart_place_ch.hub import SmartPlaceCHHub
+
+    hub = SmartPlaceCHHub(hass, **options)
+
+    async def get_main_websocket_uri(session, initial_token):
+        return server.url
+
+    # The bootstrap host is fixed in the hub, skip it
+    hub._get_main_websocket_uri = get_main_websocket_uri
+    return hub
@@ -0,0 +1,96 @@
+"""Benchmark bandwidth and CPU of the hub with and without permessage-deflate.
+
+A fake server (in its own thread, so its CPU time is not counted) replays a
+discovery menu and, on every listener connect, a burst of state frames. The
+server drops the connection after each burst to force reconnects. The hub's
+traffic counters give the payload and wire bytes. CPU is the thread time of
+the HA loop thread, where the hub receives and inflates.
+
+    python scripts/bench_compression.py [--reconnects 3] [--burst 2000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from _harness import (
+    FakeServer,
+    create_hub,
+    discovery_menu,
+    load_integration,
+    quiet_hub_logs,
+    state_frames,
+)
+
+
+async def run_mode(compression: bool, args) -> dict:
+    from homeassistant.core import HomeAssistant
+
+    menu = discovery_menu(args.lights, args.klimas, args.jalousien)
+    burst = state_frames(args.burst, args.lights, args.klimas, args.jalousien)
+    server = FakeServer(menu, connect_burst=burst, compress=True)
+    server.start_in_thread()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = create_hub(hass, server, compression=compression, verify_ssl=False)
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        if not await hub.async_setup("benchmark"):
+            raise RuntimeError("Hub setup against the fake server failed")
+
+        for round_ in range(args.reconnects + 1):
+            # Wait for the burst of this connection, then force a reconnect
+            connected = server.connections
+            while True:
+                connection = hub._connection
+                if connection is not None and connection.frames_received >= len(burst):
+                    break
+                await asyncio.sleep(0.01)
+            if round_ == args.reconnects:
+                break
+            asyncio.run_coroutine_threadsafe(server.close_all(), server.loop).result()
+            while server.connections == connected:
+                await asyncio.sleep(0.01)
+
+        await hub.stop()
+        cpu = time.thread_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        server.stop_thread()
+        await hass.async_stop(force=True)
+
+    totals = hub.diagnostics()["traffic_totals"]
+    return {"cpu": cpu, "wall": wall, **totals}
+
+
+async def main(args):
+    load_integration()
+    quiet_hub_logs()
+    print(
+        f"Discovery of {args.lights + args.klimas + args.jalousien} devices, "
+        f"{args.reconnects + 1} listener connections with a burst of {args.burst} frames each"
+    )
+    print()
+    print(f"{'mode':<14}{'payload in':>12}{'wire in':>12}{'wire out':>12}{'ratio':>8}{'cpu ms':>10}")
+    for compression in (False, True):
+        result = await run_mode(compression, args)
+        wire_in = result["wire_bytes_received"]
+        ratio = f"{wire_in / result['bytes_received']:.2f}" if wire_in else "n/a"
+        print(
+            f"{'compressed' if compression else 'uncompressed':<14}"
+            f"{result['bytes_received']:>12}{wire_in:>12}{result['wire_bytes_sent']:>12}"
+            f"{ratio:>8}{result['cpu'] * 1000:>10.1f}"
+        )
+    print()
+    print("Wire bytes are read from the TCP socket (Linux only) and include the WebSocket framing.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reconnects", type=int, default=3, help="forced reconnects per mode")
+    parser.add_argument("--burst", type=int, default=2000, help="state frames per connect")
+    parser.add_argument("--lights", type=int, default=60)
+    parser.add_argument("--klimas", type=int, default=12)
+    parser.add_argument("--jalousien", type=int, default=24)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""Benchmark frame-to-dispatch latency with and without isolated I/O under a stalled HA loop.
+
+A fake server in its own thread sends a steady stream of light frames and a
+doorbell ring every few seconds. Meanwhile a callback on the HA loop blocks it
+periodically (busy waiting), like a slow automation would. For every dispatched
+light update and doorbell ring the time since the server sent the frame is
+recorded, once with the listener on the HA loop and once with isolated_io.
+
+Entities are always updated on the HA loop, so no mode can beat the stall
+itself. What isolated_io changes is the backlog after it: frames keep being
+received and coalesced during the stall, so only the latest value per device
+is dispatched (coalesced frames are not counted as samples).
+
+    python scripts/bench_isolated_io.py [--seconds 20] [--stall 0.25] [--period 1.0]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from _harness import DOORBELL, FakeServer, create_hub, discovery_menu, load_integration
+
+LIGHTS = 60
+
+
+def summary(latencies: list[float]) -> str:
+    if not latencies:
+        return "no samples"
+    ms = sorted(value * 1000 for value in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return (
+        f"n={len(ms):>6}  mean={statistics.fmean(ms):8.2f} ms  p50={statistics.median(ms):8.2f} ms  "
+        f"p95={p95:8.2f} ms  max={ms[-1]:8.2f} ms"
+    )
+
+
+async def run_mode(isolated: bool, args) -> dict:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.dispatcher import async_dispatcher_connect
+    from smart_place_ch.const import DOMAIN, SIGNAL_DOORBELL
+
+    sent: dict[int, float] = {}
+    ring_sent: list[float] = []
+    server = FakeServer(discovery_menu(lights=LIGHTS), compress=False)
+    server.start_in_thread()
+
+    async def produce():
+        seq = 0
+        next_ring = time.perf_counter() + 1.0
+        while True:
+            frames = []
+            for _ in range(args.batch):
+                seq += 1
+                sent[seq] = time.perf_counter()
+                frames.append(f"leuchte{seq % LIGHTS + 1}:{seq}")
+            if time.perf_counter() >= next_ring:
+                ring_sent.append(time.perf_counter())
+                frames.append(DOORBELL)
+                next_ring += args.ring_interval
+            await server.send_all(frames)
+            await asyncio.sleep(args.interval)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = create_hub(hass, server, isolated_io=isolated, verify_ssl=False)
+        light_latencies: list[float] = []
+        ring_latencies: list[float] = []
+
+        def on_light(value):
+            light_latencies.append(time.perf_counter() - sent[value])
+
+        def on_ring(message, received):
+            ring_latencies.append(time.perf_counter() - ring_sent[-1])
+
+        for light_id in range(1, LIGHTS + 1):
+            async_dispatcher_connect(hass, f"update_{DOMAIN}_leuchte{light_id}", on_light)
+        async_dispatcher_connect(hass, SIGNAL_DOORBELL, on_ring)
+
+        if not await hub.async_setup("benchmark"):
+            raise RuntimeError("Hub setup against the fake server failed")
+        await asyncio.sleep(0.5)
+
+        producer = asyncio.run_coroutine_threadsafe(produce(), server.loop)
+        stalled = 0.0
+
+        def stall():
+            # Stands in for a slow automation hogging the HA loop. Busy wait,
+            # HA refuses time.sleep inside the event loop.
+            nonlocal stalled
+            until = time.perf_counter() + args.stall
+            while time.perf_counter() < until:
+                pass
+            stalled += args.stall
+            handle[0] = hass.loop.call_later(args.period, stall)
+
+        handle = [hass.loop.call_later(args.period, stall)]
+        await asyncio.sleep(args.seconds)
+        handle[0].cancel()
+        producer.cancel()
+
+        await hub.stop()
+        server.stop_thread()
+        await hass.async_stop(force=True)
+
+    return {
+        "frames_sent": len(sent),
+        "lights": light_latencies,
+        "rings": ring_latencies,
+        "stalled": stalled,
+        "queue": hub.diagnostics()["update_queue"],
+    }
+
+
+async def main(args):
+    load_integration()
+    print(
+        f"{args.seconds}s per mode, {args.batch} frames every {args.interval * 1000:.0f} ms, "
+        f"HA loop blocked {args.stall * 1000:.0f} ms every {args.period:.2f} s"
+    )
+    for isolated in (False, True):
+        result = await run_mode(isolated, args)
+        print()
+        print(f"{'isolated_io' if isolated else 'main loop'}: {result['frames_sent']} frames sent, "
+              f"HA loop blocked for {result['stalled']:.1f} s")
+        print(f"  light update latency  {summary(result['lights'])}")
+        print(f"  doorbell latency      {summary(result['rings'])}")
+        if result["queue"]:
+            queue = result["queue"]
+            print(f"  queue: {queue['coalesced']} coalesced, {queue['dropped']} dropped, "
+                  f"high watermark {queue['high_watermark']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0, help="run time per mode")
+    parser.add_argument("--stall", type=float, default=0.25, help="seconds the HA loop is blocked")
+    parser.add_argument("--period", type=float, default=1.0, help="seconds between stalls")
+    parser.add_argument("--batch", type=int, default=10, help="frames per send")
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between sends")
+    parser.add_argument("--ring-interval", type=float, default=2.5, help="seconds between doorbell rings")
+    asyncio.run(main(parser.parse_args()))
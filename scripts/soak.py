@@ -0,0 +1,349 @@
+"""Soak test: run the integration for hours of simulated time and check that resources level off.
+
+The integration is set up through its config and options flows, with all its
+platforms, against a fake server. Every event loop runs on a warped clock (--warp times
+faster than real time), so heartbeats, receive timeouts, reconnect delays and
+the schedule below take simulated time while the work itself is real:
+
+- steady state frames and doorbell rings, every --interval seconds
+- a flood of --flood frames every --flood-every minutes
+- a forced disconnect of all clients every --disconnect-every minutes
+- a reload of the config entry (hub, entities and their subscriptions) every
+  --reload-every minutes
+
+Every --sample-every minutes the process RSS, live asyncio tasks (HA loop and
+I/O loop), open sockets, threads, dispatcher subscriptions and the number of
+objects tracked by the garbage collector are sampled. Samples from the first
+--warmup part of the run are ignored. A metric keeps growing if its lowest
+value in the last third of the remaining samples is above its highest value in
+the first third, by more than its tolerance. The script then exits with 1.
+
+RSS and open sockets are read from /proc, so this runs on Linux only. The fake
+server runs in the same process, its sockets are counted too.
+
+    python scripts/soak.py [--hours 6] [--warp 60] [--isolated-io] [--compression]
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib
+import logging
+import os
+import random
+import resource
+import selectors
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from _harness import (
+    DOORBELL,
+    PACKAGE,
+    ROOT,
+    FakeServer,
+    discovery_menu,
+    quiet_hub_logs,
+    state_frames,
+)
+
+# Home Assistant imports the integration from the config directory under this name
+INTEGRATION = f"custom_components.{PACKAGE}"
+
+PAGE_SIZE = resource.getpagesize()
+
+# Growth allowed between the first and the last third of the samples
+TOLERANCES = {
+    "rss_mib": 8.0,
+    "tasks": 0,
+    "sockets": 0,
+    "threads": 0,
+    "dispatcher": 0,
+    "objects": 2000,
+}
+
+
+class WarpedSelector:
+    """Selector that waits --warp times shorter than asked."""
+
+    def __init__(self, warp: float):
+        self._warp = warp
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        if timeout is not None:
+            timeout /= self._warp
+        return self._selector.select(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class WarpedEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock runs --warp times faster than real time."""
+
+    def __init__(self, warp: float):
+        super().__init__(WarpedSelector(warp))
+        self._warp = warp
+        self._origin = time.monotonic()
+
+    def time(self) -> float:
+        return self._origin + (time.monotonic() - self._origin) * self._warp
+
+
+class WarpedEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """Hand out warped loops, including the hub's I/O loop and the fake server's."""
+
+    def __init__(self, warp: float):
+        super().__init__()
+        self._warp = warp
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        return WarpedEventLoop(self._warp)
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE / 2**20
+
+
+def open_sockets() -> int:
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                count += 1
+        except OSError:
+            pass  # Closed meanwhile
+    return count
+
+
+def sample(hass, entry) -> dict:
+    from homeassistant.helpers.dispatcher import DATA_DISPATCHER
+
+    tasks = len(asyncio.all_tasks(hass.loop))
+    hub = hass.data.get(PACKAGE, {}).get(entry.entry_id)
+    io_loop = getattr(hub, "_io_loop", None)
+    if io_loop is not None and not io_loop.is_closed():
+        tasks += len(asyncio.all_tasks(io_loop))
+    gc.collect()
+    return {
+        "rss_mib": rss_mib(),
+        "tasks": tasks,
+        "sockets": open_sockets(),
+        "threads": threading.active_count(),
+        "dispatcher": sum(len(targets) for targets in hass.data.get(DATA_DISPATCHER, {}).values()),
+        "objects": len(gc.get_objects()),
+    }
+
+
+def growing(samples: list[dict]) -> dict:
+    """Return the metrics whose floor at the end is above their peak at the start."""
+    third = max(1, len(samples) // 3)
+    first, last = samples[:third], samples[-third:]
+    growth = {}
+    for metric, tolerance in TOLERANCES.items():
+        peak = max(s[metric] for s in first)
+        floor = min(s[metric] for s in last)
+        if floor - peak > tolerance:
+            growth[metric] = (peak, floor)
+    return growth
+
+
+def type_counts() -> Counter:
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+
+
+async def set_up_home_assistant(config_dir: str):
+    """Create a Home Assistant instance that loads custom integrations from config_dir."""
+    from homeassistant import loader
+    from homeassistant.auth import auth_manager_from_config
+    from homeassistant.bootstrap import async_load_base_functionality
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.core import HomeAssistant
+
+    os.makedirs(os.path.join(config_dir, "custom_components"))
+    os.symlink(ROOT, os.path.join(config_dir, "custom_components", PACKAGE))
+    sys.path.insert(0, config_dir)
+
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await async_load_base_functionality(hass)
+    # websocket_api needs http, which needs auth. The server itself is never started.
+    hass.auth = await auth_manager_from_config(hass, [], [])
+    return hass
+
+
+async def produce(server: FakeServer, args, stats: Counter):
+    """Send state frames and doorbell rings, forever. Runs on the server's loop."""
+    rng = random.Random(1)
+    next_ring = 0.0
+    loop = asyncio.get_running_loop()
+    while True:
+        frames = state_frames(args.batch, seed=rng.random())
+        if loop.time() >= next_ring:
+            frames.append(DOORBELL)
+            next_ring = loop.time() + args.ring_every
+        await server.send_all(frames)
+        stats["frames"] += len(frames)
+        await asyncio.sleep(args.interval)
+
+
+async def main(args) -> int:
+    from homeassistant.config_entries import ConfigEntryState
+    from homeassistant.data_entry_flow import FlowResultType
+
+    quiet_hub_logs(INTEGRATION)
+    loop = asyncio.get_running_loop()
+    server = FakeServer(discovery_menu(), compress=True)
+    server.start_in_thread()
+    stats = Counter()
+
+    def on_server(coro):
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, server.loop))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await set_up_home_assistant(config_dir)
+
+        hub_module = importlib.import_module(f"{INTEGRATION}.hub")
+        const = importlib.import_module(f"{INTEGRATION}.const")
+
+        async def get_main_websocket_uri(self, session, initial_token):
+            return server.url
+
+        # The bootstrap host is fixed in the hub, skip it
+        hub_module.SmartPlaceCHHub._get_main_websocket_uri = get_main_websocket_uri
+
+        # Create the entry and set its options the way a user would, through
+        # the integration's config and options flows
+        result = await hass.config_entries.flow.async_init(
+            const.DOMAIN, context={"source": "user"}, data={const.CONF_URL: "soak"}
+        )
+        if result["type"] is not FlowResultType.CREATE_ENTRY:
+            print(f"Config flow did not create an entry: {result}")
+            return 2
+        entry = result["result"]
+        await hass.async_block_till_done()
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        result = await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                const.CONF_ISOLATED_IO: args.isolated_io,
+                const.CONF_COMPRESSION: args.compression,
+                const.CONF_VERIFY_SSL: False,
+            },
+        )
+        if result["type"] is not FlowResultType.CREATE_ENTRY:
+            print(f"Options flow failed: {result}")
+            return 2
+        # The options change reloads the entry
+        await hass.async_block_till_done()
+        if entry.state is not ConfigEntryState.LOADED:
+            print(f"Config entry did not load: {entry.state}")
+            return 2
+
+        producer = asyncio.run_coroutine_threadsafe(produce(server, args, stats), server.loop)
+        start = loop.time()
+        end = start + args.hours * 3600
+        warmup_end = start + args.hours * 3600 * args.warmup
+        schedule = {
+            "sample": start,
+            "flood": start + args.flood_every * 60,
+            "disconnect": start + args.disconnect_every * 60,
+            "reload": start + args.reload_every * 60,
+        }
+        samples = []
+        types_before = None
+
+        print(
+            f"{args.hours} h simulated at {args.warp:g}x (about {args.hours * 3600 / args.warp / 60:.1f} min), "
+            f"isolated_io={args.isolated_io}, compression={args.compression}"
+        )
+        print()
+        print(f"{'hours':>6}{'rss MiB':>10}{'tasks':>7}{'sockets':>9}{'threads':>9}{'dispatch':>10}{'objects':>10}")
+        while (now := loop.time()) < end:
+            event = min(schedule, key=schedule.get)
+            if schedule[event] > now:
+                await asyncio.sleep(min(schedule[event], end) - now)
+                continue
+            if event == "sample":
+                values = sample(hass, entry)
+                warm = now >= warmup_end
+                if warm:
+                    samples.append(values)
+                    if types_before is None:
+                        types_before = type_counts()
+                print(
+                    f"{(now - start) / 3600:>6.2f}{values['rss_mib']:>10.1f}{values['tasks']:>7}"
+                    f"{values['sockets']:>9}{values['threads']:>9}{values['dispatcher']:>10}"
+                    f"{values['objects']:>10}{'' if warm else '  (warm-up)'}"
+                )
+                schedule[event] += args.sample_every * 60
+            elif event == "flood":
+                await on_server(server.send_all(state_frames(args.flood, seed=int(now))))
+                stats["frames"] += args.flood
+                stats["floods"] += 1
+                schedule[event] += args.flood_every * 60
+            elif event == "disconnect":
+                await on_server(server.close_all())
+                stats["disconnects"] += 1
+                schedule[event] += args.disconnect_every * 60
+            elif event == "reload":
+                await hass.config_entries.async_reload(entry.entry_id)
+                await hass.async_block_till_done()
+                if entry.state is not ConfigEntryState.LOADED:
+                    print(f"Config entry did not reload: {entry.state}")
+                    return 2
+                stats["reloads"] += 1
+                schedule[event] += args.reload_every * 60
+
+        producer.cancel()
+        growth = growing(samples) if len(samples) >= 3 else {}
+        types_after = type_counts()
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+    server.stop_thread()
+
+    print()
+    print(
+        f"{stats['frames']} frames sent, {stats['floods']} floods, {stats['disconnects']} forced disconnects, "
+        f"{stats['reloads']} reloads, {server.connections} connections"
+    )
+    if len(samples) < 3:
+        print("Not enough samples after the warm-up, run longer or sample more often")
+        return 2
+    if not growth:
+        print("OK: no metric kept growing after the warm-up")
+        return 0
+    for metric, (peak, floor) in growth.items():
+        print(f"GROWING: {metric} from at most {peak:g} at the start to at least {floor:g} at the end")
+    if "objects" in growth or "rss_mib" in growth:
+        print("Object types that grew the most since the warm-up:")
+        for name, count in (types_after - types_before).most_common(10):
+            print(f"  {name:<40}{count:>+8}")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=6.0, help="simulated run time")
+    parser.add_argument("--warp", type=float, default=60.0, help="simulated seconds per real second")
+    parser.add_argument("--isolated-io", action="store_true", help="enable the isolated_io option")
+    parser.add_argument("--compression", action="store_true", help="enable the compression option")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between steady frame batches")
+    parser.add_argument("--batch", type=int, default=10, help="frames per steady batch")
+    parser.add_argument("--ring-every", type=float, default=300.0, help="seconds between doorbell rings")
+    parser.add_argument("--flood", type=int, default=5000, help="frames per flood")
+    parser.add_argument("--flood-every", type=float, default=20.0, help="minutes between floods")
+    parser.add_argument("--disconnect-every", type=float, default=15.0, help="minutes between forced disconnects")
+    parser.add_argument("--reload-every", type=float, default=30.0, help="minutes between config entry reloads")
+    parser.add_argument("--sample-every", type=float, default=10.0, help="minutes between samples")
+    parser.add_argument("--warmup", type=float, default=0.25, help="part of the run not sampled")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.set_event_loop_policy(WarpedEventLoopPolicy(args.warp))
+    sys.exit(asyncio.run(main(args)))
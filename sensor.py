@@ -10,6 +10,7 @@ from homeassistant.const import UnitOfTemperature
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
+from .aggregates import AGGREGATE_COVERS_OPEN, AGGREGATE_LIGHTS_ON
 from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,6 +25,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         # For each climate device, create a corresponding temperature sensor
         temp_sensor = SmartPlaceCHTemperatureSensor(hub, klima_id, klima_info)
         new_entities.append(temp_sensor)
+
+    for page, counts in hub.pages.counts.items():
+        # One sensor per aggregate, only for pages that have such devices
+        if counts["lights"]:
+            new_entities.append(SmartPlaceCHPageSensor(hub, page, AGGREGATE_LIGHTS_ON))
+        if counts["covers"]:
+            new_entities.append(SmartPlaceCHPageSensor(hub, page, AGGREGATE_COVERS_OPEN))
     
     if new_entities:
         async_add_entities(new_entities)
@@ -81,4 +89,57 @@ class SmartPlaceCHTemperatureSensor(SensorEntity):
             self._attr_native_value = float(value)
             if not self._attr_available:
                 self._attr_available = True
-            self.async_write_ha_state()
\ No newline at end of file
+            self.async_write_ha_state()
+
+
+class SmartPlaceCHPageSensor(SensorEntity):
+    """Number of lights on or covers open on a Smart Place CH page."""
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    # Start as unavailable, wait for the first real state update
+    _attr_available = False
+
+    def __init__(self, hub, page: str, aggregate: str):
+        """Initialize the sensor entity."""
+        self._hub = hub
+        self._page = page
+        self._aggregate = aggregate
+
+        self._attr_name = "Lights on" if aggregate == AGGREGATE_LIGHTS_ON else "Covers open"
+        self._attr_unique_id = f"{DOMAIN}_page{page}_{aggregate}"
+
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, "Page", page)},
+            "name": page,
+            "manufacturer": "Smart Place CH",
+        }
+
+    @property
+    def native_value(self) -> int:
+        """Return the count, maintained by the hub on every frame."""
+        return self._hub.pages.counts[self._page][self._aggregate]
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the number of devices the count is taken from."""
+        counts = self._hub.pages.counts[self._page]
+        total = counts["lights"] if self._aggregate == AGGREGATE_LIGHTS_ON else counts["covers"]
+        return {"total": total}
+
+    async def async_added_to_hass(self) -> None:
+        """Register for updates from the hub."""
+        update_signal = f"update_{DOMAIN}_page{self._page}"
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, update_signal, self._handle_update
+            )
+        )
+
+    @callback
+    def _handle_update(self) -> None:
+        """Handle a changed count from the hub."""
+        if not self._attr_available:
+            self._attr_available = True
+        self.async_write_ha_state()
@@ -0,0 +1,68 @@
+# custom_components/smart_place_ch/state_table.py
+
+import random
+from collections import OrderedDict
+
+SECTION_LIGHTS = "lights"
+SECTION_CLIMATE = "climate"
+SECTION_COVERS = "covers"
+
+# Climate message key -> state table field
+KLIMA_FIELDS = {
+    "TEMPIST": "current_temperature",
+    "TEMPSOLL": "target_temperature",
+    "KLIMASINFO": "mode",
+}
+
+
+class StateTable:
+    """Consolidated state of all devices, versioned per change.
+
+    Every change bumps the table version and moves the device to the end,
+    so a delta only walks the devices changed since the requested version.
+    """
+
+    def __init__(self):
+        # Changes when the table starts over, so clients can detect a reload.
+        # Random, a timestamp in seconds repeats on a quick reload. 53 bits
+        # so it survives a round trip through a JavaScript number.
+        self.epoch = random.getrandbits(53)
+        self.version = 0
+        # (section, device id) -> [version, state]
+        self._entries: OrderedDict = OrderedDict()
+
+    def add_device(self, section: str, device_id: str, name: str):
+        """Add a discovered device. This does not create a new version."""
+        self._entries.setdefault((section, device_id), [0, {"name": name}])
+        self._entries.move_to_end((section, device_id), last=False)
+
+    def update(self, section: str, device_id: str, changes: dict):
+        """Merge changed fields into a device's state."""
+        entry = self._entries.get((section, device_id))
+        if entry is None:
+            entry = self._entries[(section, device_id)] = [0, {}]
+        state = entry[1]
+        if all(state.get(field) == value for field, value in changes.items()):
+            return
+        state.update(changes)
+        self.version += 1
+        entry[0] = self.version
+        self._entries.move_to_end((section, device_id))
+
+    def snapshot(self, since: int | None = None, epoch: int | None = None) -> dict:
+        """Return the full state, or only what changed after version since."""
+        # A version from another epoch or from the future can't be trusted
+        full = since is None or epoch != self.epoch or since > self.version
+        result = {
+            "epoch": self.epoch,
+            "version": self.version,
+            "full": full,
+            SECTION_LIGHTS: {},
+            SECTION_CLIMATE: {},
+            SECTION_COVERS: {},
+        }
+        for (section, device_id), (version, state) in reversed(self._entries.items()):
+            if not full and version <= since:
+                break
+            result[section][device_id] = dict(state)
+        return result
@@ -0,0 +1,165 @@
+# custom_components/smart_place_ch/stats.py
+
+import socket
+import struct
+import threading
+import time
+
+import aiohttp
+
+# Offsets of tcpi_bytes_acked and tcpi_bytes_received in Linux' struct tcp_info
+_TCP_INFO_LEN = 136
+_TCP_INFO_BYTES = struct.Struct("=QQ")
+_TCP_INFO_BYTES_OFFSET = 120
+
+
+def _wire_bytes(sock) -> tuple[int, int] | None:
+    """Return (sent, received) bytes on the TCP socket, if the OS reports them."""
+    if sock is None or not hasattr(socket, "TCP_INFO"):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, _TCP_INFO_LEN)
+    except OSError:
+        return None
+    if len(info) < _TCP_INFO_LEN:
+        return None
+    return _TCP_INFO_BYTES.unpack_from(info, _TCP_INFO_BYTES_OFFSET)
+
+
+def _payload_len(data: str) -> int:
+    """Return the UTF-8 length of a text frame without encoding ASCII frames."""
+    return len(data) if data.isascii() else len(data.encode())
+
+
+class ConnectionStats:
+    """Byte and frame counters for one WebSocket connection.
+
+    The byte counters are the frame payloads, before compression. Where the
+    OS exposes them, the bytes on the TCP socket (after compression and TLS)
+    are reported as wire bytes.
+    """
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse):
+        self.started = time.time()
+        # Negotiated permessage-deflate window bits, 0 if not compressed
+        self.compression = ws.compress
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._sock = ws.get_extra_info("socket")
+        self._wire = None
+        ssl_object = ws.get_extra_info("ssl_object")
+        self.tls_version = ssl_object.version() if ssl_object else None
+        self.tls_session_reused = ssl_object.session_reused if ssl_object else None
+
+    def sent(self, data: str):
+        self.frames_sent += 1
+        self.bytes_sent += _payload_len(data)
+
+    def received(self, data: str):
+        self.frames_received += 1
+        self.bytes_received += _payload_len(data)
+
+    def close(self):
+        """Take the final socket counters before the socket goes away."""
+        if self._sock is not None:
+            self._wire = _wire_bytes(self._sock)
+            self._sock = None
+
+    def as_dict(self) -> dict:
+        # close() may run on the I/O thread meanwhile, read the socket once
+        sock = self._sock
+        wire = _wire_bytes(sock) if sock is not None else self._wire
+        return {
+            "started": self.started,
+            "compression": self.compression,
+            "tls_version": self.tls_version,
+            "tls_session_reused": self.tls_session_reused,
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "wire_bytes_sent": wire[0] if wire else None,
+            "wire_bytes_received": wire[1] if wire else None,
+        }
+
+
+class TrafficTotals:
+    """Counters summed over all closed connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.tls_sessions_reused = 0
+        self.totals = {
+            "frames_sent": 0,
+            "frames_received": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "wire_bytes_sent": 0,
+            "wire_bytes_received": 0,
+        }
+
+    def add(self, stats: ConnectionStats):
+        self.connections += 1
+        if stats.tls_session_reused:
+            self.tls_sessions_reused += 1
+        for key, value in stats.as_dict().items():
+            if key in self.totals and value is not None:
+                self.totals[key] += value
+
+    def as_dict(self) -> dict:
+        return {
+            "connections": self.connections,
+            "tls_sessions_reused": self.tls_sessions_reused,
+            **self.totals,
+        }
+
+
+class HandshakeStats:
+    """Connection setup (TCP and TLS handshake) times per host."""
+
+    def __init__(self):
+        # Recorded on the I/O thread in isolated mode, read on the HA loop
+        self._lock = threading.Lock()
+        # host -> [count, total seconds, last seconds, max seconds]
+        self._hosts: dict[str, list] = {}
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config that times new connections of a session."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.host = params.url.host
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_start = time.monotonic()
+
+        async def on_connection_create_end(session, context, params):
+            self.record(context.host, time.monotonic() - context.connect_start)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    def record(self, host: str, elapsed: float):
+        with self._lock:
+            entry = self._hosts.setdefault(host, [0, 0.0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = elapsed
+            entry[3] = max(entry[3], elapsed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            hosts = [(host, list(entry)) for host, entry in self._hosts.items()]
+        return {
+            host: {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 1),
+                "last_ms": round(last * 1000, 1),
+                "max_ms": round(longest * 1000, 1),
+            }
+            for host, (count, total, last, longest) in hosts
+        }
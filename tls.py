@@ -0,0 +1,50 @@
+# custom_components/smart_place_ch/tls.py
+
+import ssl
+
+from homeassistant.util.ssl import client_context
+
+
+class SessionCachingContext(ssl.SSLContext):
+    """Client SSL context that resumes the last TLS session of each host.
+
+    asyncio creates the TLS object of every connection with wrap_bio(), which
+    takes the session to resume. The hub saves the session of a connection
+    when it ends, the next connection to the same host offers it again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # SSLContext.__new__ takes the protocol, nothing to pass on
+        # server_hostname -> last session, used on the HA loop and the I/O thread
+        self._sessions: dict[str, ssl.SSLSession] = {}
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side and server_hostname:
+            session = self._sessions.get(server_hostname)
+        return super().wrap_bio(
+            incoming, outgoing, server_side=server_side,
+            server_hostname=server_hostname, session=session,
+        )
+
+    def save_session(self, ssl_object: ssl.SSLObject):
+        """Keep the session of a connection for the next one to its host."""
+        # With TLS 1.3 the session ticket arrives after the handshake, so
+        # this is called when the connection ends
+        if ssl_object.server_hostname and (session := ssl_object.session) is not None:
+            self._sessions[ssl_object.server_hostname] = session
+
+
+def session_caching_context(verify: bool) -> SessionCachingContext:
+    """Return a client context with Home Assistant's CA bundle and settings. Blocking."""
+    context = SessionCachingContext(ssl.PROTOCOL_TLS_CLIENT)
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+    # Same CA certificates and flags as HA's shared client context
+    base = client_context()
+    context.options = base.options
+    context.verify_flags = base.verify_flags
+    context.minimum_version = base.minimum_version
+    context.load_verify_locations(cadata=b"".join(base.get_ca_certs(binary_form=True)))
+    return context
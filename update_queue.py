@@ -0,0 +1,93 @@
+# custom_components/smart_place_ch/update_queue.py
+
+import threading
+from collections import OrderedDict, deque
+
+
+class UpdateQueue:
+    """Thread-safe, bounded queue that hands parsed updates to the HA loop.
+
+    Updates are keyed per device, a newer update replaces a pending one for
+    the same key, so the queue never holds more than one entry per device.
+    The producer runs on the I/O thread's event loop and never waits: when
+    the queue is full, updates for devices not already pending are dropped
+    and counted. Priority updates are never coalesced or dropped and are
+    drained first.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._pending: OrderedDict = OrderedDict()
+        self._priority: deque = deque()
+        self._closed = False
+        # Backpressure metrics
+        self._enqueued = 0
+        self._priority_enqueued = 0
+        self._coalesced = 0
+        self._drained = 0
+        self._drains = 0
+        self._high_watermark = 0
+        self._dropped = 0
+
+    def put(self, key, update) -> bool:
+        """Queue an update. Returns True if the consumer has to be woken up."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._enqueued += 1
+            if key in self._pending:
+                # Keep the queue position, only the value changes
+                self._pending[key] = update
+                self._coalesced += 1
+                return False
+            if len(self._pending) >= self._maxsize:
+                # Waiting here would stall the I/O loop, heartbeat and doorbell included
+                self._dropped += 1
+                return False
+            was_empty = not self._pending and not self._priority
+            self._pending[key] = update
+            if len(self._pending) > self._high_watermark:
+                self._high_watermark = len(self._pending)
+            return was_empty
+
+    def put_priority(self, update) -> bool:
+        """Queue a time-critical update. Returns True if the consumer has to be woken up."""
+        with self._lock:
+            if self._closed:
+                return False
+            was_empty = not self._pending and not self._priority
+            self._priority.append(update)
+            self._priority_enqueued += 1
+            return was_empty
+
+    def drain(self) -> list:
+        """Take all priority updates, then all pending updates in arrival order."""
+        with self._lock:
+            updates = list(self._priority)
+            updates.extend(self._pending.values())
+            self._priority.clear()
+            self._pending.clear()
+            self._drained += len(updates)
+            self._drains += 1
+        return updates
+
+    def close(self):
+        """Stop accepting updates."""
+        with self._lock:
+            self._closed = True
+
+    def stats(self) -> dict:
+        """Return the queue metrics."""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "maxsize": self._maxsize,
+                "enqueued": self._enqueued,
+                "priority_enqueued": self._priority_enqueued,
+                "coalesced": self._coalesced,
+                "dispatched": self._drained,
+                "drains": self._drains,
+                "high_watermark": self._high_watermark,
+                "dropped": self._dropped,
+            }
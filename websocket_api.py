@@ -0,0 +1,32 @@
+# custom_components/smart_place_ch/websocket_api.py
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, CONF_SINCE, CONF_EPOCH
+
+
+@callback
+def async_setup(hass: HomeAssistant):
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_snapshot)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/snapshot",
+    vol.Optional(CONF_SINCE): int,
+    vol.Optional(CONF_EPOCH): int,
+})
+@callback
+def ws_snapshot(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict):
+    """Return the state of all devices, or the changes since a version."""
+    hubs = hass.data.get(DOMAIN)
+    if not hubs:
+        connection.send_error(msg["id"], "not_loaded", "Smart Place CH is not loaded")
+        return
+    # Only a single config entry is allowed
+    hub = next(iter(hubs.values()))
+    connection.send_result(
+        msg["id"], hub.states.snapshot(msg.get(CONF_SINCE), msg.get(CONF_EPOCH))
+    )